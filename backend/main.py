@@ -1,17 +1,41 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from types import MappingProxyType
+from functools import lru_cache
+from collections import Counter, defaultdict
+from operator import itemgetter
+import heapq
+import math
+import orjson
+import os
+import re
+import secrets
 import uvicorn
 
-app = FastAPI(title="Legal Document Search API")
+# /cache/clear is only registered when an admin token is configured, and
+# callers must send it in the X-Admin-Token header.
+CACHE_ADMIN_TOKEN = os.environ.get("CACHE_ADMIN_TOKEN")
+
+# Handlers are pure CPU and sub-millisecond, so they stay async def and run
+# inline on the event loop; orjson takes over response encoding. Swagger UI
+# lives at /swagger so the custom /docs endpoint below is reachable.
+app = FastAPI(
+    title="Legal Document Search API",
+    default_response_class=ORJSONResponse,
+    docs_url="/swagger",
+)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:5173", "http://0.0.0.0:3000"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,
 )
 
 LEGAL_DOCUMENTS = [
@@ -55,6 +79,184 @@ LEGAL_DOCUMENTS = [
         violated without authorization."""
     }
 ]
+# Read-only from here on: the index, excerpts and /docs payload below are all
+# derived from these documents once at import.
+LEGAL_DOCUMENTS = tuple(MappingProxyType(doc) for doc in LEGAL_DOCUMENTS)
+
+# Inverted index over the document contents, built once at import.
+# Terms that occur in every document carry no ranking signal (idf == 0),
+# so they are left out of the postings entirely. Term weights use sublinear
+# tf and are length-normalized per document, so one repeated word cannot
+# outrank a rarer topic keyword.
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+# General English function words; they never identify a document.
+STOPWORDS = frozenset({
+    "a", "about", "after", "again", "against", "all", "also", "am", "an", "and",
+    "any", "are", "as", "at", "be", "because", "been", "before", "being",
+    "below", "between", "both", "but", "by", "can", "could", "did", "do",
+    "does", "doing", "down", "during", "each", "either", "few", "finally",
+    "for", "four", "from", "further", "had", "has", "have", "having", "he",
+    "her", "here", "him", "his", "how", "if", "in", "into", "is", "it", "its",
+    "just", "may", "me", "might", "more", "most", "must", "my", "no", "nor",
+    "not", "now", "of", "off", "on", "once", "one", "only", "or", "other",
+    "our", "out", "over", "own", "plus", "same", "several", "she", "should",
+    "so", "some", "something", "such", "than", "that", "the", "their", "them",
+    "then", "there", "these", "they", "this", "those", "three", "through",
+    "thus", "to", "too", "two", "under", "until", "up", "upon", "very", "via",
+    "vs", "was", "we", "were", "what", "when", "where", "whether", "which",
+    "while", "who", "whom", "why", "will", "with", "within", "without",
+    "would", "yet", "you", "your"
+})
+
+# Words every document in this legal corpus is about. They are not function
+# words, but here they only add noise, so the tokenizer drops them as well.
+CORPUS_STOPWORDS = frozenset({"law", "legal", "right"})
+
+_IGNORED_TERMS = STOPWORDS | CORPUS_STOPWORDS
+
+MAX_RESULTS = len(LEGAL_DOCUMENTS)
+MATCH_SCORE = 0.9
+FALLBACK_SCORE = 0.5
+
+# Canned summaries per topic, in priority order: when a query hits several
+# topics the first one listed here wins.
+SUMMARY_TEMPLATES = {
+    "contract": ("Based on the legal documents, a valid contract requires several essential "
+                 "elements including offer, acceptance, consideration, capacity, and lawful purpose. "
+                 "All parties must have legal capacity and the contract's purpose must be lawful."),
+    "employment": ("Employment law covers various aspects of the employer-employee relationship, "
+                   "including wage and hour regulations, workplace safety, and anti-discrimination "
+                   "protections. Employers must comply with federal standards and provide safe "
+                   "working conditions."),
+    "ip": ("Intellectual property rights protect creations of the mind through patents, "
+           "trademarks, copyrights, and trade secrets. Each type of protection serves "
+           "different purposes and has specific duration and requirements."),
+}
+DEFAULT_SUMMARY_TEMPLATE = (
+    "Found {n} relevant legal document(s) related to your query. "
+    "The documents provide information on various aspects of law including contracts, "
+    "employment regulations, and intellectual property rights."
+)
+
+# Query word prefixes that select a summary topic ("contractual" -> contract).
+# Longest keywords come first in the alternation so one regex scan finds them all.
+KW_TO_TEMPLATE = {
+    "contract": "contract",
+    "employment": "employment",
+    "employee": "employment",
+    "patent": "ip",
+    "trademark": "ip",
+    "copyright": "ip",
+    "intellectual property": "ip",
+    "ip": "ip",
+}
+_SUMMARY_KEYWORD_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(kw) for kw in sorted(KW_TO_TEMPLATE, key=len, reverse=True)) + ")"
+)
+
+
+_NORM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Lowercase the query, turn punctuation into spaces and collapse whitespace,
+    so "What is a contract?" and "  what is  a contract " share a cache entry.
+    """
+    return _NORM_RE.sub(" ", query.lower()).strip()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split lowercased text into index terms, dropping ignored terms and one-letter
+    fragments (the "s" of "contract's") and folding simple plurals
+    ("patents" -> "patent") so queries match either form.
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(text):
+        if len(token) < 2:
+            continue
+        if len(token) > 2 and token.endswith("s") and not token.endswith("ss") and token not in _IGNORED_TERMS:
+            token = token[:-1]
+        if token in _IGNORED_TERMS:
+            continue
+        terms.append(token)
+    return terms
+
+
+# Struct-of-arrays view of LEGAL_DOCUMENTS: the hot path addresses documents
+# by position instead of looking fields up in per-document dicts.
+IDS = tuple(doc["id"] for doc in LEGAL_DOCUMENTS)
+TITLES = tuple(doc["title"] for doc in LEGAL_DOCUMENTS)
+CONTENTS = tuple(doc["content"] for doc in LEGAL_DOCUMENTS)
+EXCERPTS = tuple(content.strip()[:200] + "..." for content in CONTENTS)
+NUM_DOCS = len(IDS)
+
+
+def _build_index() -> Tuple[Counter, Dict[str, List[Tuple[int, float]]]]:
+    """
+    Tokenize every document and return (document frequencies, postings), where
+    postings map each term to (document position, normalized weight) pairs.
+    """
+    doc_term_freqs = [Counter(tokenize(content.lower())) for content in CONTENTS]
+    doc_freq = Counter()
+    for term_freqs in doc_term_freqs:
+        doc_freq.update(term_freqs.keys())
+    
+    postings = defaultdict(list)
+    for i, term_freqs in enumerate(doc_term_freqs):
+        weights = {}
+        for term, tf in term_freqs.items():
+            idf = math.log(NUM_DOCS / doc_freq[term])
+            if idf > 0:
+                weights[term] = (1 + math.log(tf)) * idf
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        for term, weight in weights.items():
+            postings[term].append((i, weight / norm))
+    return doc_freq, dict(postings)
+
+
+DOC_FREQ, POSTINGS = _build_index()
+
+# Shortest index term a query word may fall back to by prefix, and the longest
+# prefix worth trying (no index term is longer).
+MIN_PREFIX_LEN = 4
+MAX_TERM_LEN = max(map(len, POSTINGS))
+
+
+def index_term(token: str) -> Optional[str]:
+    """
+    Map a query token to an index term: the token itself, or else the longest
+    indexed prefix of it ("contractual" -> "contract"). None if neither exists.
+    """
+    if token in POSTINGS:
+        return token
+    for end in range(min(len(token) - 1, MAX_TERM_LEN), MIN_PREFIX_LEN - 1, -1):
+        if token[:end] in POSTINGS:
+            return token[:end]
+    return None
+
+
+# One bit per document position; TERM_BITS[term] is the OR of the bits of
+# every document in that term's posting list.
+DOC_BITS = tuple(1 << i for i in range(NUM_DOCS))
+
+
+def _build_term_bits() -> Dict[str, int]:
+    """
+    Return the matched-document bitmask for every indexed term.
+    """
+    term_bits = {}
+    for term, postings in POSTINGS.items():
+        bits = 0
+        for i, _ in postings:
+            bits |= DOC_BITS[i]
+        term_bits[term] = bits
+    return term_bits
+
+
+TERM_BITS = _build_term_bits()
 
 
 class QueryRequest(BaseModel):
@@ -73,6 +275,23 @@ class SearchResponse(BaseModel):
     relevant_docs: List[RelevantDocument]
 
 
+# Internal result types for /generate. They mirror RelevantDocument and
+# SearchResponse field for field, and orjson serializes them natively, so the
+# Pydantic models are only used for the OpenAPI schema.
+@dataclass(slots=True, frozen=True)
+class _RelDoc:
+    doc_id: str
+    title: str
+    excerpt: str
+    relevance_score: float
+
+
+@dataclass(slots=True, frozen=True)
+class _SearchResult:
+    summary: str
+    relevant_docs: Tuple[_RelDoc, ...]
+
+
 class DocumentInfo(BaseModel):
     id: str
     title: str
@@ -88,81 +307,148 @@ class DocsResponse(BaseModel):
     endpoints: List[dict]
 
 
-def search_documents(query: str) -> SearchResponse:
+DOCUMENTS_INFO = [
+    DocumentInfo(
+        id=doc_id,
+        title=title,
+        content_length=len(content)
+    )
+    for doc_id, title, content in zip(IDS, TITLES, CONTENTS)
+]
+
+API_ENDPOINTS = [
+    {
+        "path": "/",
+        "method": "GET",
+        "description": "Health check endpoint"
+    },
+    {
+        "path": "/docs",
+        "method": "GET",
+        "description": "Get API documentation and available legal documents"
+    },
+    {
+        "path": "/generate",
+        "method": "POST",
+        "description": "Search legal documents and generate summary",
+        "request_body": {
+            "query": "string (required)"
+        },
+        "response": {
+            "summary": "string",
+            "relevant_docs": "array of documents with relevance scores"
+        }
+    }
+]
+if CACHE_ADMIN_TOKEN:
+    API_ENDPOINTS.append({
+        "path": "/cache/clear",
+        "method": "POST",
+        "description": "Clear the cached /generate responses in the worker process that handles the request (requires X-Admin-Token header)"
+    })
+
+DOCS_RESPONSE = DocsResponse(
+    api_name="Legal Document Search API",
+    version="1.0.0",
+    description="API for searching and summarizing legal documents. Contains 3 hardcoded legal documents covering Contract Law, Employment Law, and Intellectual Property Rights.",
+    total_documents=NUM_DOCS,
+    documents=DOCUMENTS_INFO,
+    endpoints=API_ENDPOINTS
+)
+_DOCS_JSON = orjson.dumps(DOCS_RESPONSE.model_dump())
+
+# Queries with no indexed terms return every document at FALLBACK_SCORE, and
+# only the summary can still vary (by topic), so these responses are built once.
+_FALLBACK_DOCS = tuple(
+    _RelDoc(
+        doc_id=IDS[i],
+        title=TITLES[i],
+        excerpt=EXCERPTS[i],
+        relevance_score=FALLBACK_SCORE
+    )
+    for i in range(NUM_DOCS)
+)
+_FALLBACK_RESPONSES = {
+    topic: _SearchResult(summary=summary, relevant_docs=_FALLBACK_DOCS)
+    for topic, summary in SUMMARY_TEMPLATES.items()
+}
+_FALLBACK_RESPONSES[None] = _SearchResult(
+    summary=DEFAULT_SUMMARY_TEMPLATE.format(n=NUM_DOCS),
+    relevant_docs=_FALLBACK_DOCS
+)
+
+
+# Longer queries are searched without caching, so the cache holds at most
+# 1024 short keys per worker however large request bodies get.
+MAX_CACHED_QUERY_LEN = 256
+
+
+@lru_cache(maxsize=1024)
+def _search_documents_cached(query_norm: str) -> _SearchResult:
     """
-    Mock search function that finds relevant documents based on query keywords.
-    In a real application, this would use vector embeddings or full-text search.
+    Memoized search keyed by the output of normalize_query.
+    LEGAL_DOCUMENTS is static, so the response for a given query never changes.
     """
-    query_lower = query.lower()
-    results = []
+    return search_documents(query_norm)
 
-    keywords_map = {
-        "contract": ["doc_001"],
-        "employment": ["doc_002"],
-        "patent": ["doc_003"],
-        "trademark": ["doc_003"],
-        "copyright": ["doc_003"],
-        "wage": ["doc_002"],
-        "discrimination": ["doc_002"],
-        "agreement": ["doc_001"],
-        "intellectual property": ["doc_003"],
-        "ip": ["doc_003"]
-    }
+
+def search_documents(query_lower: str) -> _SearchResult:
+    """
+    Ranks documents by accumulating tf-idf weights from the inverted index over
+    the query terms. The best match scores MATCH_SCORE and the rest are scaled
+    towards FALLBACK_SCORE; if no term matches, every document is returned at
+    FALLBACK_SCORE. Expects the query already lowercased by the caller.
+    """
+    results = []
     
-    matched_docs = set()
-    for keyword, doc_ids in keywords_map.items():
-        if keyword in query_lower:
-            matched_docs.update(doc_ids)
+    scores = [0.0] * NUM_DOCS
+    matched = 0
+    query_terms = Counter(term for term in map(index_term, tokenize(query_lower)) if term is not None)
+    for term, qf in query_terms.items():
+        matched |= TERM_BITS[term]
+        for i, weight in POSTINGS[term]:
+            scores[i] += weight * qf
     
-    if not matched_docs:
-        matched_docs = {doc["id"] for doc in LEGAL_DOCUMENTS}
+    hits = []
+    while matched:
+        i = (matched & -matched).bit_length() - 1
+        matched &= matched - 1
+        hits.append((i, scores[i]))
     
-    for doc in LEGAL_DOCUMENTS:
-        if doc["id"] in matched_docs:
-            score = 0.9 if any(kw in query_lower for kw, ids in keywords_map.items() if doc["id"] in ids) else 0.5
-            
-            excerpt = doc["content"].strip()[:200] + "..."
-            
-            results.append(RelevantDocument(
-                doc_id=doc["id"],
-                title=doc["title"],
-                excerpt=excerpt,
-                relevance_score=score
-            ))
+    if not hits:
+        return _FALLBACK_RESPONSES[summary_topic(query_lower)]
     
-    results.sort(key=lambda x: x.relevance_score, reverse=True)
+    ranked = heapq.nlargest(MAX_RESULTS, hits, key=itemgetter(1))
+    top_score = ranked[0][1]
+    for i, doc_score in ranked:
+        results.append(_RelDoc(
+            doc_id=IDS[i],
+            title=TITLES[i],
+            excerpt=EXCERPTS[i],
+            relevance_score=FALLBACK_SCORE + (MATCH_SCORE - FALLBACK_SCORE) * (doc_score / top_score)
+        ))
     
-    summary = generate_summary(query, results)
+    summary = generate_summary(query_lower, results)
     
-    return SearchResponse(summary=summary, relevant_docs=results)
+    return _SearchResult(summary=summary, relevant_docs=tuple(results))
 
 
-def generate_summary(query: str, relevant_docs: List[RelevantDocument]) -> str:
+def summary_topic(query_lower: str) -> Optional[str]:
+    """
+    Return the SUMMARY_TEMPLATES key selected by the query, or None.
+    """
+    topics = {KW_TO_TEMPLATE[kw] for kw in _SUMMARY_KEYWORD_RE.findall(query_lower)}
+    return next((key for key in SUMMARY_TEMPLATES if key in topics), None)
+
+
+def generate_summary(query_lower: str, relevant_docs: List[_RelDoc]) -> str:
     """
     Generate a mock summary based on the query and relevant documents.
     """
-    if not relevant_docs:
-        return "No relevant documents found for your query."
-    
-    query_lower = query.lower()
-    
-    if "contract" in query_lower:
-        return ("Based on the legal documents, a valid contract requires several essential "
-                "elements including offer, acceptance, consideration, capacity, and lawful purpose. "
-                "All parties must have legal capacity and the contract's purpose must be lawful.")
-    elif "employment" in query_lower or "employee" in query_lower:
-        return ("Employment law covers various aspects of the employer-employee relationship, "
-                "including wage and hour regulations, workplace safety, and anti-discrimination "
-                "protections. Employers must comply with federal standards and provide safe "
-                "working conditions.")
-    elif any(word in query_lower for word in ["patent", "trademark", "copyright", "intellectual property", "ip"]):
-        return ("Intellectual property rights protect creations of the mind through patents, "
-                "trademarks, copyrights, and trade secrets. Each type of protection serves "
-                "different purposes and has specific duration and requirements.")
-    else:
-        return (f"Found {len(relevant_docs)} relevant legal document(s) related to your query. "
-                "The documents provide information on various aspects of law including contracts, "
-                "employment regulations, and intellectual property rights.")
+    template_key = summary_topic(query_lower)
+    if template_key is None:
+        return DEFAULT_SUMMARY_TEMPLATE.format(n=len(relevant_docs))
+    return SUMMARY_TEMPLATES[template_key]
 
 
 @app.get("/")
@@ -175,50 +461,9 @@ async def root():
 async def get_docs():
     """
     Custom documentation endpoint that provides information about available documents and API endpoints.
-    Note: FastAPI also provides interactive documentation at /docs (Swagger UI) and /redoc (ReDoc)
-    """
-    documents_info = [
-        DocumentInfo(
-            id=doc["id"],
-            title=doc["title"],
-            content_length=len(doc["content"])
-        )
-        for doc in LEGAL_DOCUMENTS
-    ]
-    
-    endpoints = [
-        {
-            "path": "/",
-            "method": "GET",
-            "description": "Health check endpoint"
-        },
-        {
-            "path": "/docs",
-            "method": "GET",
-            "description": "Get API documentation and available legal documents"
-        },
-        {
-            "path": "/generate",
-            "method": "POST",
-            "description": "Search legal documents and generate summary",
-            "request_body": {
-                "query": "string (required)"
-            },
-            "response": {
-                "summary": "string",
-                "relevant_docs": "array of documents with relevance scores"
-            }
-        }
-    ]
-    
-    return DocsResponse(
-        api_name="Legal Document Search API",
-        version="1.0.0",
-        description="API for searching and summarizing legal documents. Contains 3 hardcoded legal documents covering Contract Law, Employment Law, and Intellectual Property Rights.",
-        total_documents=len(LEGAL_DOCUMENTS),
-        documents=documents_info,
-        endpoints=endpoints
-    )
+    Note: FastAPI also provides interactive documentation at /swagger (Swagger UI) and /redoc (ReDoc)
+    """
+    return Response(content=_DOCS_JSON, media_type="application/json")
 
 
 @app.post("/generate", response_model=SearchResponse)
@@ -230,8 +475,12 @@ async def generate_response(request: QueryRequest):
         if not request.query or not request.query.strip():
             raise HTTPException(status_code=400, detail="Query cannot be empty")
         
-        response = search_documents(request.query)
-        return response
+        query_norm = normalize_query(request.query)
+        if len(query_norm) > MAX_CACHED_QUERY_LEN:
+            response = search_documents(query_norm)
+        else:
+            response = _search_documents_cached(query_norm)
+        return ORJSONResponse(response)
         
     except HTTPException:
         raise
@@ -239,5 +488,43 @@ async def generate_response(request: QueryRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+async def clear_cache(x_admin_token: str = Header(default="")):
+    """
+    Admin endpoint that drops the memoized /generate responses.
+    Each uvicorn worker keeps its own cache, so this clears only the worker
+    process that serves the request.
+    """
+    if not secrets.compare_digest(x_admin_token.encode(), CACHE_ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    _search_documents_cached.cache_clear()
+    return {"status": "ok", "message": f"Search cache cleared in worker process {os.getpid()}"}
+
+
+if CACHE_ADMIN_TOKEN:
+    app.post("/cache/clear")(clear_cache)
+
+
+def _worker_count() -> int:
+    """
+    Number of uvicorn workers: WEB_CONCURRENCY if set, otherwise the CPUs this
+    process may run on (which respects container cpusets, unlike cpu_count).
+    """
+    if os.environ.get("WEB_CONCURRENCY"):
+        return max(1, int(os.environ["WEB_CONCURRENCY"]))
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Workers share nothing but read-only module state, so the service scales
+    # across cores; each worker builds its own index and response cache.
+    # loop="auto" picks uvloop where uvicorn[standard] installs it (not Windows).
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="httptools",
+        workers=_worker_count(),
+    )
\ No newline at end of file
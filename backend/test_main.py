@@ -0,0 +1,145 @@
+import asyncio
+import importlib
+import os
+import unittest
+from unittest import mock
+
+import orjson
+from fastapi import HTTPException
+from starlette.routing import Match
+
+import main
+from main import normalize_query, search_documents
+
+
+def search(query):
+    return search_documents(normalize_query(query))
+
+
+class NormalizeQueryTest(unittest.TestCase):
+    def test_case_punctuation_and_spacing_share_one_key(self):
+        variants = ["What is a contract?", "what is a contract", "  what is  a contract ", "WHAT, is a contract!!"]
+        self.assertEqual({normalize_query(query) for query in variants}, {"what is a contract"})
+
+    def test_punctuation_becomes_a_word_break(self):
+        self.assertEqual(normalize_query("contract-law\tbasics"), "contract law basics")
+        self.assertEqual(normalize_query("?!"), "")
+
+
+class SearchDocumentsTest(unittest.TestCase):
+    # Keyword -> document pairs the original hand-written keyword map returned.
+    BASELINE_KEYWORDS = {
+        "contract": "doc_001",
+        "agreement": "doc_001",
+        "employment": "doc_002",
+        "wage": "doc_002",
+        "discrimination": "doc_002",
+        "patent": "doc_003",
+        "trademark": "doc_003",
+        "copyright": "doc_003",
+        "intellectual property": "doc_003",
+        "ip": "doc_003",
+    }
+
+    def test_baseline_keywords_rank_their_document_first(self):
+        for query, doc_id in self.BASELINE_KEYWORDS.items():
+            with self.subTest(query=query):
+                response = search(query)
+                self.assertEqual(response.relevant_docs[0].doc_id, doc_id)
+                self.assertEqual(response.relevant_docs[0].relevance_score, 0.9)
+
+    def test_generic_words_do_not_outrank_topic_keywords(self):
+        self.assertEqual(search("copyright law").relevant_docs[0].doc_id, "doc_003")
+        self.assertEqual(search("employee rights").relevant_docs[0].doc_id, "doc_002")
+
+    def test_inflected_query_words_match_index_terms(self):
+        response = search("contractual obligations")
+        self.assertEqual(response.relevant_docs[0].doc_id, "doc_001")
+        self.assertTrue(response.summary.startswith("Based on the legal documents, a valid contract"))
+        self.assertEqual(search("IPs").relevant_docs[0].doc_id, "doc_003")
+        self.assertEqual(search("contract" + "x" * 100000).relevant_docs[0].doc_id, "doc_001")
+
+    def test_possessives_do_not_match_unrelated_documents(self):
+        self.assertEqual(search("a patent's term").relevant_docs[0].doc_id, "doc_003")
+        self.assertEqual([doc.doc_id for doc in search("employer's duties").relevant_docs], ["doc_002"])
+        self.assertEqual([doc.doc_id for doc in search("What's IP?").relevant_docs], ["doc_003"])
+        response = search("inventor's rights")
+        self.assertTrue(all(doc.relevance_score == 0.5 for doc in response.relevant_docs))
+
+    def test_summary_topics_match_at_word_start_only(self):
+        response = search("relationship")
+        self.assertEqual(response.relevant_docs[0].doc_id, "doc_002")
+        self.assertFalse(response.summary.startswith("Intellectual property"))
+
+    def test_unmatched_query_returns_every_document_at_fallback_score(self):
+        response = search("xyzzy")
+        self.assertEqual([doc.doc_id for doc in response.relevant_docs], ["doc_001", "doc_002", "doc_003"])
+        self.assertTrue(all(doc.relevance_score == 0.5 for doc in response.relevant_docs))
+
+
+class GenerateResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        main._search_documents_cached.cache_clear()
+
+    def generate(self, query):
+        return asyncio.run(main.generate_response(main.QueryRequest(query=query)))
+
+    def test_short_queries_are_cached(self):
+        self.generate("What is a contract?")
+        self.generate("what is a contract")
+        info = main._search_documents_cached.cache_info()
+        self.assertEqual((info.hits, info.currsize), (1, 1))
+
+    def test_long_queries_bypass_the_cache(self):
+        self.generate("contract " * 100)
+        self.assertEqual(main._search_documents_cached.cache_info().currsize, 0)
+
+
+class CacheClearEndpointTest(unittest.TestCase):
+    def reload_main(self, token):
+        env = {key: value for key, value in os.environ.items() if key != "CACHE_ADMIN_TOKEN"}
+        if token is not None:
+            env["CACHE_ADMIN_TOKEN"] = token
+        with mock.patch.dict(os.environ, env, clear=True):
+            return importlib.reload(main)
+
+    def setUp(self):
+        # Restore the module as configured by the real environment.
+        self.addCleanup(importlib.reload, main)
+
+    def test_not_registered_without_admin_token(self):
+        module = self.reload_main(None)
+        self.assertNotIn("/cache/clear", [route.path for route in module.app.routes])
+        self.assertNotIn("/cache/clear", [endpoint["path"] for endpoint in module.API_ENDPOINTS])
+
+    def test_requires_matching_admin_token(self):
+        module = self.reload_main("s3cret")
+        self.assertIn("/cache/clear", [route.path for route in module.app.routes])
+        # FastAPI passes "" when the X-Admin-Token header is missing.
+        for header in ("", "wrong"):
+            with self.subTest(header=header):
+                with self.assertRaises(HTTPException) as ctx:
+                    asyncio.run(module.clear_cache(x_admin_token=header))
+                self.assertEqual(ctx.exception.status_code, 403)
+        response = asyncio.run(module.clear_cache(x_admin_token="s3cret"))
+        self.assertEqual(response["status"], "ok")
+
+
+class DocsEndpointTest(unittest.TestCase):
+    def resolve(self, path):
+        scope = {"type": "http", "path": path, "method": "GET"}
+        return next(route for route in main.app.routes if route.matches(scope)[0] is Match.FULL)
+
+    def test_docs_path_serves_the_json_listing(self):
+        self.assertIs(self.resolve("/docs").endpoint, main.get_docs)
+        response = asyncio.run(main.get_docs())
+        self.assertEqual(response.media_type, "application/json")
+        self.assertEqual(orjson.loads(response.body), main.DOCS_RESPONSE.model_dump())
+
+    def test_swagger_ui_moved_off_docs(self):
+        self.assertEqual(main.app.docs_url, "/swagger")
+        self.assertNotEqual(self.resolve("/swagger").endpoint, main.get_docs)
+
+
+if __name__ == "__main__":
+    unittest.main()